@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measures import time of the package in fresh interpreters.
+Run it before and after changes which touch imports of the package.
+
+Usage: python benchmarks/import_time.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), '..' )
+
+CASES = [
+    ( 'import kaiten', 'import kaiten' ),
+    ( 'import kaiten, access Client', 'import kaiten; kaiten.Client' ),
+    ( 'create Client', "import kaiten; kaiten.Client('localhost', 'user', 'password')" ),
+]
+
+
+def measure(code, runs):
+    """Returns median time of the code in fresh interpreters in milliseconds"""
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [
+                sys.executable, '-c',
+                'import time; started = time.perf_counter(); {}; '
+                'print( time.perf_counter() - started )'.format(code),
+            ],
+            cwd = ROOT, stdout = subprocess.PIPE, universal_newlines = True, check = True,
+        )
+        times.append( float( result.stdout ) * 1000 )
+    return statistics.median( times )
+
+
+def main():
+    runs = int( sys.argv[1] ) if len(sys.argv) > 1 else 20
+    for name, code in CASES:
+        print( '{:<32} {:>8.1f} ms'.format( name, measure( code, runs ) ) )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compares HTTP/1.1 connection pooling with HTTP/2 multiplexing on a local server.
+
+HTTP/1.1 is served by http.server from the standard library,
+HTTP/2 (with prior knowledge over plain tcp) is served by hypercorn,
+so the second part requires: pip install httpx[http2] hypercorn
+
+Usage: python benchmarks/transport.py [requests] [concurrency]
+"""
+
+import asyncio
+import http.client
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), '..' ) )
+
+from kaiten import Client
+from kaiten.transport import HTTPSTransport, HTTP2Transport
+
+BODY = json.dumps([
+    { 'id': id, 'title': 'Card {}'.format(id), 'description': 'x' * 200 }
+    for id in range(20)
+]).encode('utf8')
+DELAY = 0.005
+
+
+class Handler (http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep( DELAY )
+        self.send_response( 200 )
+        self.send_header( 'Content-Type', 'application/json' )
+        self.send_header( 'Content-Length', str( len(BODY) ) )
+        self.end_headers()
+        self.wfile.write( BODY )
+
+    def log_message(self, *args):
+        pass
+
+
+async def app(scope, receive, send):
+    await asyncio.sleep( DELAY )
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [ (b'content-type', b'application/json') ],
+    })
+    await send({ 'type': 'http.response.body', 'body': BODY })
+
+
+def start_http1_server():
+    server = http.server.ThreadingHTTPServer( ('127.0.0.1', 0), Handler )
+    threading.Thread( target = server.serve_forever, daemon = True ).start()
+    return '127.0.0.1:{}'.format( server.server_address[1] )
+
+
+def start_http2_server(port = 18443):
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [ '127.0.0.1:{}'.format(port) ]
+    config.loglevel = 'ERROR'
+    threading.Thread(
+        target = lambda: asyncio.run( serve( app, config ) ),
+        daemon = True,
+    ).start()
+    time.sleep( 1 )
+    return '127.0.0.1:{}'.format(port)
+
+
+def run(name, transport, requests, concurrency):
+    client = Client( transport.host, 'user', 'password', transport = transport )
+    client.__request__( 'GET', '/cards' )
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor( concurrency ) as executor:
+        list( executor.map(
+            lambda id: client.__request__( 'GET', '/cards/' + str(id) ),
+            range(requests),
+        ) )
+    elapsed = time.perf_counter() - started
+
+    transport.close()
+    print( '{:<28} {:>8.3f}s {:>10.1f} req/s'.format( name, elapsed, requests / elapsed ) )
+
+
+def main():
+    requests = int( sys.argv[1] ) if len(sys.argv) > 1 else 2000
+    concurrency = int( sys.argv[2] ) if len(sys.argv) > 2 else 32
+
+    host = start_http1_server()
+    run(
+        'HTTP/1.1, pool of {}'.format(concurrency),
+        HTTPSTransport( host, pool_size = concurrency, connection_class = http.client.HTTPConnection ),
+        requests,
+        concurrency,
+    )
+
+    try:
+        host = start_http2_server()
+    except ImportError:
+        print( 'HTTP/2 skipped, install httpx[http2] and hypercorn' )
+        return
+    run( 'HTTP/2, one connection', HTTP2Transport( host, scheme = 'http' ), requests, concurrency )
+
+
+if __name__ == '__main__':
+    main()
@@ -25,5 +25,15 @@
 
 __version__ = "0.1"
 
-from kaiten.client import Client
-import kaiten.exceptions
\ No newline at end of file
+import kaiten.exceptions
+
+
+def __getattr__(name):
+    """Imports client and its dependencies on first access to keep import of the package fast"""
+    if name == 'Client':
+        from kaiten.client import Client
+        return Client
+    if name in ( 'client', 'transport', 'events', 'registry', 'scheduler', 'profiling' ):
+        import importlib
+        return importlib.import_module( 'kaiten.' + name )
+    raise AttributeError( "module 'kaiten' has no attribute '{}'".format(name) )
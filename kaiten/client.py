@@ -5,69 +5,252 @@
 Client functionality for Kaiten API.
 """
 
-import http.client
-import base64
+import itertools
 import json
+import sys
+import time
 import weakref
-import pprint
-import urllib
+
+from copy import deepcopy
 
 from kaiten.exceptions import *
 
+# Transport, compression and debug dependencies are imported on first use
+# to keep import of the package fast
+
 
 
 API_VERSION = 'v1'
 USER_AGENT  = "KaitenAPIClientPython"
+LOGGER_NAME = 'kaiten.client'
+
+
+class LogBody (object):
+    """Body of request or response for log records,
+    which is decoded and truncated only if a handler formats the record"""
+    def __init__(self, body, limit=None):
+        self.body = body
+        self.limit = limit
+
+    def __str__(self):
+        truncated = self.limit is not None and len(self.body) > self.limit
+        body = self.body[:self.limit] if truncated else self.body
+        if isinstance( body, bytes ):
+            body = body.decode( errors = 'replace' )
+        if truncated:
+            body += '... (truncated, {} in total)'.format( len(self.body) )
+        return body
+
+
+class LogHeaders (object):
+    """Headers of request for log records, credentials are redacted"""
+    REDACTED = ( 'authorization', )
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def __str__(self):
+        return str({
+            key: '<redacted>' if key.lower() in self.REDACTED else value
+            for key, value in self.headers.items()
+        })
 
 
 class KaitenObject (object):
+    # Name of field which refers to objects of the class in filters,
+    # for example 'board_id', and fields of ancestors which can be taken from data
+    ID_FIELD = None
+    SCOPE_FIELDS = ()
+
     __parent = None
+    __client = None
+    __uri = None
+    __scope = {}
+    __path = ()
 
     def __str__(self):
+        import pprint
         return  pprint.PrettyPrinter( indent = 4 ).pformat( self.__dict__ )
 
     def __init__( self, parent, data={} ):
         self.__parent = weakref.ref( parent )
+        self.__client = parent.__get_client__()
+        if 'id' in data :
+            self.id = data['id']
+        self.__uri = self.__build_uri__( parent )
+        self.__scope = self.__build_scope__( parent, data )
+        self.__path = parent.__get_path__() + ( ( type(self).__name__, data.get('id') ), )
+
+        profiler = self.__client.profiler
+        if profiler is None:
+            self.__assign__( data )
+        else:
+            profiler.enter_model( type(self).__name__ )
+            try:
+                self.__assign__( data )
+            finally:
+                profiler.exit_model()
+
+    def __assign__(self, data):
+        """Assigns data which was gotten from api server to attributes of the object"""
+        self.__deserialize__( data )
         for key in data: setattr( self, key, data[key] )
 
+    def __deserialize__(self, data):
+        """Converts nested structures of data to objects, called before
+        the rest of data is assigned to attributes of the object
+        :param data: Raw data of the object, deserialized fields should be popped
+        :type data: dict
+        """
+        pass
+
     def __get_parent__(self):
         return self.__parent()
 
+    def __get_client__(self):
+        return self.__client
+
+    def __get_absolute_uri__(self):
+        """Returns absolute path of the object after entry point of API,
+        which was computed when the object was created"""
+        return self.__uri
+
+    def __get_path__(self):
+        """Returns names of classes and ids of the object and its ancestors, starting
+        from the outermost one, for example ( ('Card', 1), ('Checklist', 2) )"""
+        return self.__path
+
+    def __get_scope__(self):
+        """Returns ids of the object and its ancestors, which were recorded when
+        the object was created, for example { 'space_id': 1, 'board_id': 2 }"""
+        return self.__scope
+
+    def __build_scope__(self, parent, data):
+        scope = dict( parent.__get_scope__() ) if parent.ID_FIELD else {}
+        for field in self.SCOPE_FIELDS:
+            if field in data :
+                scope[field] = data[field]
+        if self.ID_FIELD and 'id' in data :
+            scope[self.ID_FIELD] = data['id']
+        return scope
+
+    def __build_uri__(self, parent):
+        if type(self).__get_uri__ is KaitenObject.__get_uri__ or not hasattr(self, 'id'):
+            return None
+        uri = self.__get_uri__()
+        if uri[0] == '/':
+            return uri
+        parent_uri = parent.__get_absolute_uri__()
+        return None if parent_uri is None else parent_uri + '/' + uri
+
     def __get_item_by_id__(self, path, item_class, id, params = {}):
         item = self.__request__( 'GET', path + '/' + str(id), params)
-        return globals()[ item_class ](self, item)
+        return MODELS[ item_class ](self, item)
 
     def __get_items__(self, path, item_class, params = {}):
         items = self.__request__('GET', path, params)
-        return [ globals()[ item_class ]( self, item ) for item in items ]
+        return [ MODELS[ item_class ]( self, item ) for item in items ]
 
     def __update__(self, item_class, params ):
         data = self.__request__('PATCH', '', params)
-        for key in data: setattr( self, key, data[key] )
+
+        mirror = self.__get_client__().mirror
+        if mirror is None:
+            self.__assign__( data )
+        else:
+            mirror.update( self, data )
 
     def __delete__(self, params = {}):
         self.__request__('DELETE', '', params)
 
+        parents = []
+        parent = self.__get_parent__()
+        if parent is not None:
+            parents.append( parent )
+
+        mirror = self.__get_client__().mirror
+        if mirror is not None:
+            copy = mirror.find_path( self.__get_path__()[:-1] )
+            if copy is not None and copy is not parent:
+                parents.append( copy )
+
+        for parent in parents:
+            parent.__remove_child__( self )
+        if mirror is not None:
+            mirror.remove( self )
+
     def __create_item__(self, path, item_class, params ):
-        item = self.__request__('POST', path, params)
-        return globals()[ item_class ](self, item)
+        data = self.__request__('POST', path, params)
+        item = MODELS[ item_class ]( self, deepcopy(data) )
+
+        if path[0] != '/':
+            owners = [ self ]
+            field = path.replace('-', '_')
+        else:
+            # Cards are created by absolute path, they belong to the board with their board_id
+            owners = self.__get_boards__( data.get('board_id') ) if isinstance( item, Card ) else []
+            field = 'cards'
+
+        mirror = self.__get_client__().mirror
+        if mirror is None:
+            for owner in owners:
+                owner.__add_child__( field, item )
+        else:
+            mirror.add( item, data, owners, field )
+        return item
+
+    def __get_boards__(self, id):
+        """Returns the object or its ancestor which is the board with the id, if there is one"""
+        node = self
+        while node is not None and not isinstance( node, Client ):
+            if isinstance( node, Board ) and getattr( node, 'id', None ) == id:
+                return [ node ]
+            node = node.__get_parent__()
+        return []
+
+    def __add_child__(self, field, child):
+        """Adds created child to the list of the object. An item with the same id,
+        which could be added by an event before the request has returned, is replaced"""
+        items = self.__dict__.get( field )
+        if not isinstance( items, list ):
+            return
+        id = getattr( child, 'id', None )
+        for index, item in enumerate( items ):
+            if id is not None and type(item) is type(child) and getattr( item, 'id', None ) == id:
+                items[index] = child
+                return
+        items.append( child )
+
+    def __remove_child__(self, child):
+        """Removes deleted child from lists of the object"""
+        for items in self.__dict__.values():
+            if isinstance( items, list ):
+                items[:] = [
+                    item for item in items
+                    if not ( type(item) is type(child) and getattr( item, 'id', None ) == child.id )
+                ]
 
     def __request__(self, method, path, params = {}):
-        path = path if path and path[0] == '/' else  ( self.__get_uri__() + '/' + path )
-        return self.__get_parent__().__request__( method, path, params )
+        if not path or path[0] != '/':
+            uri = self.__get_absolute_uri__()
+            if uri is None:
+                raise NotImplementedError('You should implement methot __get_uri__ in descendant class')
+            path = uri + '/' + path
+        return self.__get_client__().__request__( method, path, params )
 
     def __get_uri__(self):
         raise NotImplementedError('You should implement methot __get_uri__ in descendant class')
 
     def __deserialize_item__( self, field, item_class, data ):
         if field in data :
-            setattr( self, field,  globals()[ item_class ]( self, data.pop(field) ) )
+            setattr( self, field,  MODELS[ item_class ]( self, data.pop(field) ) )
 
     def __deserialize_list__( self, field, item_class, data ):
-        setattr( self, field, [] )
+        # A list which is missing in data is kept, so partial data doesn't clear it
         if field in data :
-            for item in data.pop(field):
-                getattr(self, field).append( globals()[ item_class ](self, item) )
+            setattr( self, field, [ MODELS[ item_class ](self, item) for item in data.pop(field) ] )
+        elif field not in self.__dict__ :
+            setattr( self, field, [] )
 
 
 class Client (KaitenObject):
@@ -79,8 +262,21 @@ class Client (KaitenObject):
     username = None
     password = None
     debug = False
-
-    def __init__(self, host, username, password, debug=False ):
+    transport = None
+    compress_threshold = None
+    mirror = None
+    logger = None
+    log_sample_rate = 1
+    log_body_limit = None
+    rate_budget = None
+    scheduler = None
+    profiler = None
+    __auth_credentials = None
+    __auth_key = None
+    __headers = None
+
+    def __init__(self, host, username, password, debug=False, transport=None, compress_threshold=None,
+                 log_sample_rate=1, log_body_limit=1000, rate_budget=None, scheduler=None ):
         """
         :param host: IP or hostname of Kaiten server
         :type host: string
@@ -88,14 +284,46 @@ class Client (KaitenObject):
         :type username: string
         :param password: User's password for connection
         :type password: string
-        :param debug: this is a flag, which enables printing debug informationю
-        :type channel: bool
+        :param debug: this is a flag, which enables debug logging of requests of this client
+            to stdout. Without it requests are logged with level DEBUG to logger 'kaiten.client',
+            which can be configured with logging module for all clients.
+        :type debug: bool
+        :param transport: Transport which delivers requests to the server,
+            by default HTTPSTransport with a pool of HTTP/1.1 connections,
+            which is created on the first request.
+            HTTP2Transport multiplexes concurrent requests over one connection.
+        :type transport: kaiten.transport.Transport
+        :param compress_threshold: Request bodies which are bigger than that
+            amount of bytes are sent compressed with gzip, disabled by default
+        :type compress_threshold: int
+        :param log_sample_rate: Only one of that amount of requests is logged
+        :type log_sample_rate: int
+        :param log_body_limit: Max amount of characters of logged bodies, None for no limit
+        :type log_body_limit: int
+        :param rate_budget: Limits the rate of requests of the client,
+            requests wait for the budget before they are sent
+        :type rate_budget: kaiten.registry.RateBudget
+        :param scheduler: Orders requests by priority classes and limits requests in flight,
+            can be shared by several clients
+        :type scheduler: kaiten.scheduler.RequestScheduler
         """
         self.host = host
         self.username = username
         self.password = password
         self.debug = debug
+        self.transport = transport
+        self.compress_threshold = compress_threshold
+        self.log_sample_rate = log_sample_rate
+        self.log_body_limit = log_body_limit
+        self.__log_counter = itertools.count()
+        self.rate_budget = rate_budget
+        self.scheduler = scheduler
 
+    def __get_client__(self):
+        return self
+
+    def __get_absolute_uri__(self):
+        return ''
 
     def __request__(self, method, path, params = {}):
         """Performs HTTP request with credentials, returning the deserialized body json of request
@@ -107,50 +335,135 @@ class Client (KaitenObject):
             which will be serialized to json and putted in request body
         :type params: dict
         """
-        conn = http.client.HTTPSConnection( self.host )
-
         request_body = ''
         if method == 'GET' :
+            import urllib.parse
             query_string = urllib.parse.urlencode(params)
             if query_string:
                 path = '?'.join([ path, query_string ])
         else :
             request_body = json.dumps(params)
 
-        conn.request(
-            method,
-            self.__get_url_for__(path),
-            request_body,
-            self.__get_headers__(),
-        )
-
-        if self.debug :
-            print(
-                "Sending request to {} with method {}.\nRequest body:\n{}\n".format(
-                    path, method, request_body
-                )
+        headers = self.__get_headers__()
+        log = self.__is_logged__()
+        if log :
+            self.logger.debug(
+                "Sending request to %s with method %s.\nHeaders: %s\nRequest body:\n%s\n",
+                path, method, LogHeaders( headers ), LogBody( request_body, self.log_body_limit ),
+                extra = { 'method': method, 'path': path },
             )
-        resp = conn.getresponse()
 
-        body = resp.read().decode()
-        if self.debug :
-            print(
-                "Response code: {}\nResponse body:\n{} \n".format(
-                    resp.status, body
-                )
+        data = request_body.encode('utf8') if request_body else None
+        if data and self.compress_threshold is not None and len(data) > self.compress_threshold:
+            import gzip
+            data = gzip.compress( data )
+            headers['Content-Encoding'] = 'gzip'
+
+        profiler = self.profiler
+        timings = None
+        if profiler is not None:
+            timings = [ time.perf_counter() ]
+
+        # Budget is awaited before a slot is taken, so a client which is out of budget
+        # doesn't hold slots of the scheduler shared with other clients
+        if self.rate_budget is not None:
+            self.rate_budget.acquire()
+
+        if self.scheduler is not None:
+            with self.scheduler.slot():
+                resp = self.__send__( method, path, data, headers, timings )
+        else:
+            resp = self.__send__( method, path, data, headers, timings )
+
+        body = resp.body
+        if log :
+            self.logger.debug(
+                "Response code: %s\nResponse body:\n%s \n",
+                resp.status, LogBody( body, self.log_body_limit ),
+                extra = { 'method': method, 'path': path, 'status': resp.status },
             )
 
         if resp.status == 200:
+            if profiler is not None:
+                parsing = time.perf_counter()
             try:
-                return json.loads(body)
-            except json.decoder.JSONDecodeError:
-                raise InvalidResponseFormat( path, method, body )
+                result = json.loads(body)
+            except ( json.decoder.JSONDecodeError, UnicodeDecodeError ):
+                raise InvalidResponseFormat( path, method, body.decode( errors = 'replace' ) )
+            if profiler is not None:
+                queued, sending, received = timings
+                profiler.record_request(
+                    method, path, len( data or b'' ), len(body),
+                    queue   = sending - queued,
+                    network = received - sending - resp.decode_time,
+                    decode  = resp.decode_time,
+                    parse   = time.perf_counter() - parsing,
+                )
+            return result
         elif resp.status == 401:
             raise UnauthorizedAccess( self.username )
         elif resp.status == 403:
             raise AccessDenied( self.username, path, method )
         else:
-            raise UnexpectedError( resp.status, path, method, body )
+            raise UnexpectedError( resp.status, path, method, body.decode( errors = 'replace' ) )
+
+    def profile(self):
+        """Returns profiler, which accumulates counters of requests and constructed objects
+        inside of with statement:
+
+            with client.profile() as profiler:
+                client.get_cards()
+            print( profiler.report() )
+        """
+        from kaiten.profiling import Profiler
+        return Profiler( self )
+
+    def __send__(self, method, path, data, headers, timings=None):
+        """Sends request through the transport, appending times
+        when the request was sent and received to timings, if they are requested"""
+        transport = self.__get_transport__()
+        if timings is not None:
+            timings.append( time.perf_counter() )
+        resp = transport.request(
+            method,
+            self.__get_url_for__(path),
+            data,
+            headers,
+        )
+        if timings is not None:
+            timings.append( time.perf_counter() )
+        return resp
+
+    def __get_transport__(self):
+        """Returns transport of the client, creating the default one on the first request"""
+        if self.transport is None:
+            from kaiten.transport import HTTPSTransport
+            self.transport = HTTPSTransport( self.host )
+        return self.transport
+
+    def __get_logger__(self):
+        """Returns logger of the client or None. logging is imported only if debug is set
+        or the application has imported it, otherwise nothing could be configured to log."""
+        if self.logger is None and ( self.debug or 'logging' in sys.modules ):
+            import logging
+            if self.debug:
+                # Own logger, which isn't registered in logging, so debug mode
+                # of the client doesn't enable logging of other clients
+                self.logger = logging.Logger( LOGGER_NAME, logging.DEBUG )
+                self.logger.addHandler( logging.StreamHandler( sys.stdout ) )
+            else:
+                self.logger = logging.getLogger( LOGGER_NAME )
+        return self.logger
+
+    def __is_logged__(self):
+        """Returns True if the current request should be logged"""
+        logger = self.__get_logger__()
+        if logger is None:
+            return False
+        import logging
+        if not logger.isEnabledFor( logging.DEBUG ):
+            return False
+        return self.log_sample_rate <= 1 or next( self.__log_counter ) % self.log_sample_rate == 0
 
     def __get_url_for__(self, path):
         """Returns absolute path for request with entry point of API
@@ -161,17 +474,27 @@ class Client (KaitenObject):
 
     def __get_headers__(self):
         """Returns HTTP headers for request"""
-        return {
-            'Authorization': self.__get_auth_key__(),
-            'Content-Type' : 'application/json',
-            'User-Agent'   : USER_AGENT,
-        }
+        if self.__headers is None:
+            from kaiten.transport import ACCEPT_ENCODING
+            self.__headers = {
+                'Content-Type'   : 'application/json',
+                'Accept-Encoding': ACCEPT_ENCODING,
+                'User-Agent'     : USER_AGENT,
+            }
+        headers = dict( self.__headers )
+        headers['Authorization'] = self.__get_auth_key__()
+        return headers
 
     def __get_auth_key__(self):
-        """Returns auth key for API"""
-        user_pass = ":".join( [ self.username, self.password ] )
-        key = base64.b64encode( user_pass.encode('utf8') )
-        return "Basic " + key.decode('utf8');
+        """Returns auth key for API, which is computed once for current credentials"""
+        credentials = ( self.username, self.password )
+        if self.__auth_credentials != credentials:
+            import base64
+            user_pass = ":".join( credentials )
+            key = base64.b64encode( user_pass.encode('utf8') )
+            self.__auth_key = "Basic " + key.decode('utf8')
+            self.__auth_credentials = credentials
+        return self.__auth_key
 
     def get_spaces(self):
         """Returns a list of all avalible spaces"""
@@ -207,6 +530,77 @@ class Client (KaitenObject):
         """
         return self.__get_item_by_id__('/cards', 'Card', id)
 
+    def get_time_logs_bulk(self, cards=None, params={}, group_by=('user_id', 'role_id', 'for_date'),
+                           date_from=None, date_to=None, workers=8):
+        """Fetches time logs of many cards concurrently and returns sums of time_spent
+        grouped by requested fields, for example { (user_id, role_id, for_date): minutes }.
+        Time logs are folded into the sums as soon as they are received,
+        without creating CardTimeLog objects.
+        The API returns all time logs of a card, so the date range is applied
+        after they are fetched; narrow down cards with params to fetch less.
+        :param cards: Cards or ids of cards, by default all cards which fit to params
+        :type cards: list
+        :param params: Parameters for get_cards request, used when cards is None,
+            all pages of results are fetched.
+            Full list of avalible parameters is avalible on
+            https://faq.kaiten.io/docs/api#cards-get
+        :type params: dict
+        :param group_by: Fields of time log to group by
+        :type group_by: tuple
+        :param date_from: First date of logs in format YYYY-MM-DD, inclusive
+        :type date_from: string
+        :param date_to: Last date of logs in format YYYY-MM-DD, inclusive
+        :type date_to: string
+        :param workers: Number of concurrent requests
+        :type workers: int
+        """
+        if cards is None:
+            cards = [ card['id'] for card in self.__get_pages__( '/cards', params ) ]
+        ids = [ card.id if isinstance( card, Card ) else card for card in cards ]
+
+        import concurrent.futures
+        import contextvars
+
+        totals = {}
+        def fold(logs):
+            for log in logs:
+                # for_date can be a timestamp, logs are grouped by date
+                log['for_date'] = for_date = ( log.get('for_date') or '' )[:10]
+                if date_from and for_date < date_from or date_to and for_date > date_to:
+                    continue
+                key = tuple( log.get(field) for field in group_by )
+                totals[key] = totals.get( key, 0 ) + ( log.get('time_spent') or 0 )
+
+        # Only a couple of requests per worker are kept in flight,
+        # so received time logs are released as soon as they are summed up
+        with concurrent.futures.ThreadPoolExecutor( workers ) as executor:
+            pending = set()
+            for id in ids:
+                # Requests run in a copy of the caller's context to keep its scheduler priority
+                pending.add( executor.submit(
+                    contextvars.copy_context().run,
+                    self.__request__, 'GET', '/cards/' + str(id) + '/time-logs',
+                ) )
+                if len(pending) >= 2 * workers:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when = concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done: fold( future.result() )
+            for future in concurrent.futures.as_completed( pending ):
+                fold( future.result() )
+        return totals
+
+    def __get_pages__(self, path, params = {}, page_size = 100):
+        """Yields items of all pages of the list, requesting them with limit and offset"""
+        offset = 0
+        while True:
+            items = self.__request__( 'GET', path, dict( params, limit = page_size, offset = offset ) )
+            for item in items:
+                yield item
+            if len(items) < page_size:
+                return
+            offset += len(items)
+
     def get_users(self):
         """Returns a list of all avalible users"""
         return self.__get_items__('/users', 'User')
@@ -242,10 +636,10 @@ class Client (KaitenObject):
         )
 
 class Space (KaitenObject):
-    def __init__(self, parent, data={}):
-        self.__deserialize_list__('boards', 'Board', data)
+    ID_FIELD = 'space_id'
 
-        KaitenObject.__init__( self, parent, data )
+    def __deserialize__(self, data):
+        self.__deserialize_list__('boards', 'Board', data)
 
     def __get_uri__(self):
         return '/spaces/' + str(self.id)
@@ -289,8 +683,7 @@ class Space (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-get
         :type params: dict
         """
-        params['space_id'] = self.id
-        return self.__get_parent__().get_cards(params)
+        return self.__get_client__().get_cards( dict( params, **self.__get_scope__() ) )
 
     def get_users(self):
         """Returns a list of all avalible users for the current space"""
@@ -328,13 +721,14 @@ class Space (KaitenObject):
 
 
 class Board (KaitenObject):
-    def __init__(self, parent, data={}):
+    ID_FIELD = 'board_id'
+    SCOPE_FIELDS = ( 'space_id', )
+
+    def __deserialize__(self, data):
         self.__deserialize_list__('columns', 'Column', data)
         self.__deserialize_list__('lanes', 'Lane', data)
         self.__deserialize_list__('cards', 'Card', data)
 
-        KaitenObject.__init__( self, parent, data )
-
     def __get_uri__(self):
         return '/boards/' + str(self.id)
 
@@ -387,8 +781,7 @@ class Board (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-get
         :type params: dict
         """
-        params['board_id'] = self.id
-        return self.__get_parent__().get_cards(params)
+        return self.__get_client__().get_cards( dict( params, **self.__get_scope__() ) )
 
     def create_card(self, column_id, lane_id, title, params={}):
         """Adds new card type in current board
@@ -403,15 +796,17 @@ class Board (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-post
         :type params: dict
         """
-        return self.__get_parent__().create_card(
-            board_id  = self.id,
-            column_id = column_id,
-            lane_id   = lane_id,
-            title     = title,
-            params    = params,
-        )
+        params = dict( params, **self.__get_scope__() )
+        params['column_id'] = column_id
+        params['lane_id']   = lane_id
+        params['title']     = title
+
+        return self.__create_item__('/cards', 'Card', params)
 
 class Column (KaitenObject):
+    ID_FIELD = 'column_id'
+    SCOPE_FIELDS = ( 'space_id', 'board_id' )
+
     def __get_uri__(self):
         return 'columns/' + str(self.id)
 
@@ -440,8 +835,7 @@ class Column (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-get
         :type params: dict
         """
-        params['column_id'] = self.id
-        return self.__get_parent__().get_cards(params)
+        return self.__get_client__().get_cards( dict( params, **self.__get_scope__() ) )
 
     def create_card(self, lane_id, title, params={}):
         """Adds new card type in current column
@@ -454,15 +848,17 @@ class Column (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-post
         :type params: dict
         """
-        return self.__get_parent__().create_card(
-            column_id = self.id,
-            lane_id   = lane_id,
-            title     = title,
-            params    = params,
-        )
+        params = dict( params, **self.__get_scope__() )
+        params['lane_id'] = lane_id
+        params['title']   = title
+
+        return self.__create_item__('/cards', 'Card', params)
 
 
 class Lane (KaitenObject):
+    ID_FIELD = 'lane_id'
+    SCOPE_FIELDS = ( 'space_id', 'board_id' )
+
     def __get_uri__(self):
         return 'lanes/' + str(self.id)
 
@@ -491,8 +887,7 @@ class Lane (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-get
         :type params: dict
         """
-        params['lane_id'] = self.id
-        return self.__get_parent__().get_cards(params)
+        return self.__get_client__().get_cards( dict( params, **self.__get_scope__() ) )
 
     def create_card(self, column_id, title, params={}):
         """Adds new card type in current lane
@@ -505,12 +900,11 @@ class Lane (KaitenObject):
             https://faq.kaiten.io/docs/api#cards-post
         :type params: dict
         """
-        return self.__get_parent__().create_card(
-            lane_id   = self.id,
-            column_id = column_id,
-            title     = title,
-            params    = params,
-        )
+        params = dict( params, **self.__get_scope__() )
+        params['column_id'] = column_id
+        params['title']     = title
+
+        return self.__create_item__('/cards', 'Card', params)
 
 class User (KaitenObject):
     pass
@@ -519,7 +913,7 @@ class TimeSheet (KaitenObject):
     pass
 
 class Card (KaitenObject):
-    def __init__(self, parent, data={}):
+    def __deserialize__(self, data):
         self.__deserialize_item__('type', 'CardType', data)
         self.__deserialize_list__('tags', 'Tag', data)
         self.__deserialize_list__('members', 'User', data)
@@ -541,8 +935,6 @@ class Card (KaitenObject):
             if 'lane' in data :
                 del data['lane']
 
-        KaitenObject.__init__( self, parent, data )
-
     def __get_uri__(self):
         return '/cards/' + str(self.id)
 
@@ -723,7 +1115,7 @@ class CardBlocker (KaitenObject):
     pass
 
 class CardFile (KaitenObject):
-    def __init__(self, parent, data={}):
+    def __deserialize__(self, data):
         self.__deserialize_item__('author', 'User', data)
 
 class CardTimeLog (KaitenObject):
@@ -761,11 +1153,9 @@ class CardDefinitionOfDone (KaitenObject):
         return self.__delete__()
 
 class Checklist (KaitenObject):
-    def __init__(self, parent, data={}):
+    def __deserialize__(self, data):
         self.__deserialize_list__('items', 'ChecklistItem', data)
 
-        KaitenObject.__init__( self, parent, data )
-
     def __get_uri__(self):
         return 'checklists/' + str(self.id)
 
@@ -809,4 +1199,13 @@ class ChecklistItem (KaitenObject):
 
     def delete(self):
         """Deletes this check list item"""
-        return self.__delete__()
\ No newline at end of file
+        return self.__delete__()
+
+
+MODELS = {
+    model.__name__: model for model in (
+        Space, Board, Column, Lane, User, TimeSheet, Card, Tag, ExternalLink, Comment,
+        CardType, CardChild, CardBlocker, CardFile, CardTimeLog, CardDefinitionOfDone,
+        Checklist, ChecklistItem,
+    )
+}
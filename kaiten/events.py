@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Local mirror of cards and boards which is kept fresh by Kaiten webhooks
+instead of polling.
+"""
+
+import http.server
+import json
+import threading
+
+from copy import deepcopy
+
+from kaiten.client import Board, Card
+from kaiten.exceptions import UnexpectedError
+
+
+class Mirror (object):
+    """Local store of cards and boards, keyed by id.
+
+    Events are applied in order of the 'updated' field of their data,
+    so repeated and late events don't override newer state.
+    """
+
+    MODELS = {
+        'card' : Card,
+        'board': Board,
+    }
+    KINDS = { model.__name__: kind for kind, model in MODELS.items() }
+    DELETE_ACTIONS = ( 'delete', 'remove' )
+    PAGE_SIZE = 100
+
+    def __init__(self, client, params={}):
+        """
+        :param client: Client which is used for reconciliation,
+            the mirror is registered as client.mirror, so the changes which are made
+            through the client are applied to the mirror as well
+        :type client: kaiten.Client
+        :param params: Parameters of get_cards request for reconciliation.
+            Full list of avalible parameters is avalible on
+            https://faq.kaiten.io/docs/api#cards-get
+        :type params: dict
+        """
+        self.client = client
+        self.params = params
+        self.__items = {}
+        self.__versions = {}
+        self.__lock = threading.RLock()
+        self.__timer = None
+
+        client.mirror = self
+
+    def get_card(self, id):
+        """Returns a card with requested id or None if it isn't mirrored
+        :param id: id of requested card
+        :type id: int
+        """
+        return self.__items.get( ('card', id) )
+
+    def get_board(self, id):
+        """Returns a board with requested id or None if it isn't mirrored
+        :param id: id of requested board
+        :type id: int
+        """
+        return self.__items.get( ('board', id) )
+
+    def get_cards(self):
+        """Returns a list of all mirrored cards"""
+        return [ item for (kind, id), item in list( self.__items.items() ) if kind == 'card' ]
+
+    def apply(self, event):
+        """Applies webhook event, returns True if the event has changed the mirror
+        :param event: Deserialized body of webhook, for example
+            { 'event': 'card:update', 'data': { 'id': 1, 'updated': '...', ... } }
+        :type event: dict
+        """
+        kind, _, action = event.get( 'event', '' ).partition(':')
+        data = event.get('data')
+        if kind not in self.MODELS or not isinstance( data, dict ) or 'id' not in data:
+            return False
+
+        if action in self.DELETE_ACTIONS:
+            return self.discard( kind, data['id'], data.get('updated') )
+        return self.put( kind, data )
+
+    def put(self, kind, data):
+        """Puts raw data of the item to the mirror unless the mirror has a newer version,
+        returns True if the mirror has been changed
+        :param kind: 'card' or 'board'
+        :type kind: string
+        :param data: Raw data of the item
+        :type data: dict
+        """
+        key = ( kind, data['id'] )
+        updated = data.get('updated')
+        with self.__lock:
+            if not self.__is_newer__( key, updated ):
+                return False
+            self.__versions[key] = updated
+
+            item = self.__items.get(key)
+            if item is None:
+                self.__items[key] = self.MODELS[kind]( self.client, data )
+            else:
+                item.__assign__( data )
+            return True
+
+    def discard(self, kind, id, updated=None):
+        """Removes the item from the mirror, returns True if the mirror has been changed
+        :param kind: 'card' or 'board'
+        :type kind: string
+        :param id: id of the item
+        :type id: int
+        :param updated: Time of removal, older events of the item will be ignored
+        :type updated: string
+        """
+        key = ( kind, id )
+        with self.__lock:
+            if not self.__is_newer__( key, updated ):
+                return False
+            self.__versions[key] = updated
+            return self.__items.pop( key, None ) is not None
+
+    def find(self, item):
+        """Returns mirrored copy of the object: a card, a board or a nested object of them.
+        Returns None if there is no such copy in the mirror.
+        :param item: Object which copy is requested
+        :type item: kaiten.client.KaitenObject
+        """
+        return self.find_path( item.__get_path__() )
+
+    def find_path(self, path):
+        """Returns mirrored object by its path, which is recorded by objects when they are built
+        :param path: Names of classes and ids of the object and its ancestors
+        :type path: tuple
+        """
+        for index in range( len(path) - 1, -1, -1 ):
+            name, id = path[index]
+            if name not in self.KINDS:
+                continue
+            copy = self.__items.get( ( self.KINDS[name], id ) )
+            for name, id in path[index + 1:]:
+                if copy is None:
+                    break
+                copy = self.__get_child__( copy, name, id )
+            if copy is not None:
+                return copy
+        return None
+
+    def update(self, item, data):
+        """Applies result of update request to the object and to its mirrored copy,
+        returns True if the mirror has been changed
+        :param item: Updated object
+        :type item: kaiten.client.KaitenObject
+        :param data: Data which was returned by api server
+        :type data: dict
+        """
+        with self.__lock:
+            # Nested data is popped while objects are built from it, so each object gets its own copy
+            item.__assign__( deepcopy(data) )
+            copy = self.find( item )
+            if copy is None:
+                return False
+
+            name = type(item).__name__
+            if name in self.KINDS:
+                key = ( self.KINDS[name], item.id )
+                updated = data.get('updated')
+                current = self.__versions.get(key)
+                if updated is not None and current is not None and updated < current:
+                    return False
+                if updated is not None:
+                    self.__versions[key] = updated
+
+            if copy is not item:
+                copy.__assign__( deepcopy(data) )
+            return True
+
+    def add(self, item, data, owners, field):
+        """Applies result of create request: puts created card or board to the mirror
+        and adds the object to lists of its owners and of their mirrored copies
+        :param item: Created object
+        :type item: kaiten.client.KaitenObject
+        :param data: Data which was returned by api server
+        :type data: dict
+        :param owners: Objects which lists the created object belongs to
+        :type owners: list
+        :param field: Name of the lists
+        :type field: string
+        """
+        name = type(item).__name__
+        with self.__lock:
+            mirrored = item
+            if name in self.KINDS:
+                key = ( self.KINDS[name], item.id )
+                self.put( key[0], deepcopy(data) )
+                mirrored = self.__items.get( key, item )
+
+            copies = []
+            for owner in owners:
+                owner.__add_child__( field, item )
+                copies.append( self.find( owner ) )
+            if name == 'Card':
+                copies.append( self.get_board( data.get('board_id') ) )
+
+            for copy in copies:
+                if copy is not None and copy not in owners:
+                    copy.__add_child__( field, mirrored )
+
+    def remove(self, item):
+        """Removes deleted card or board from the mirror. Its last known version
+        is kept, so events older than the deletion don't bring it back.
+        :param item: Deleted object
+        :type item: kaiten.client.KaitenObject
+        """
+        name = type(item).__name__
+        if name not in self.KINDS:
+            return False
+
+        key = ( self.KINDS[name], item.id )
+        with self.__lock:
+            versions = [
+                version for version in ( self.__versions.get(key), getattr( item, 'updated', None ) )
+                if version is not None
+            ]
+            self.__versions[key] = max( versions ) if versions else None
+            return self.__items.pop( key, None ) is not None
+
+    def reconcile(self):
+        """Fetches cards with get_cards and mirrored boards to catch up events which were missed.
+        Mirrored cards which fit to params of the mirror, but weren't returned, are removed.
+        """
+        fetched = set()
+        offset = 0
+        while True:
+            params = dict( self.params, limit = self.PAGE_SIZE, offset = offset )
+            cards = self.client.__request__( 'GET', '/cards', params )
+            for card in cards:
+                fetched.add( card['id'] )
+                self.put( 'card', card )
+            if len(cards) < self.PAGE_SIZE:
+                break
+            offset += len(cards)
+
+        for card in self.get_cards():
+            if card.id not in fetched and self.__is_in_scope__( card ):
+                self.__remove__( ( 'card', card.id ) )
+
+        for ( kind, id ), board in list( self.__items.items() ):
+            if kind != 'board':
+                continue
+            try:
+                self.put( 'board', self.client.__request__( 'GET', '/boards/' + str(id) ) )
+            except UnexpectedError as e:
+                if e.status != 404:
+                    raise
+                self.__remove__( ( 'board', id ) )
+
+    def start_reconciliation(self, interval=3600):
+        """Starts periodic reconciliation in background thread,
+        reconciliation which was started before is stopped
+        :param interval: Interval between reconciliations in seconds
+        :type interval: float
+        """
+        def run():
+            try:
+                self.reconcile()
+            finally:
+                with self.__lock:
+                    # Timer is rescheduled only if reconciliation wasn't stopped or restarted meanwhile
+                    if self.__timer is threading.current_thread():
+                        self.__start_timer__( interval, run )
+
+        with self.__lock:
+            self.stop_reconciliation()
+            self.__start_timer__( interval, run )
+
+    def stop_reconciliation(self):
+        """Stops periodic reconciliation"""
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+    def __start_timer__(self, interval, function):
+        self.__timer = threading.Timer( interval, function )
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __get_child__(self, item, name, id):
+        for value in list( item.__dict__.values() ):
+            for child in ( value if isinstance( value, list ) else [ value ] ):
+                if type(child).__name__ == name and getattr( child, 'id', None ) == id:
+                    return child
+        return None
+
+    def __remove__(self, key):
+        """Removes the item, keeping its last known version,
+        so events older than that version are still ignored"""
+        with self.__lock:
+            self.__items.pop( key, None )
+
+    def __is_in_scope__(self, card):
+        """Returns True if the card fits to params of the mirror. Cards for which
+        it can't be checked, for example because of text search, are out of scope"""
+        for key, value in self.params.items():
+            if key in ( 'limit', 'offset' ):
+                continue
+            if getattr( card, key, None ) != value:
+                return False
+        return True
+
+    def __is_newer__(self, key, updated):
+        if key not in self.__versions:
+            return True
+        current = self.__versions[key]
+        if updated is None or current is None:
+            return True
+        return updated > current
+
+
+class EventReceiver (object):
+    """HTTP endpoint which accepts Kaiten webhooks and applies them to a mirror"""
+
+    MAX_BODY_SIZE = 1024 * 1024
+
+    def __init__(self, mirror, path, host='127.0.0.1', port=8080, max_body_size=MAX_BODY_SIZE):
+        """
+        :param mirror: Mirror which events are applied to
+        :type mirror: Mirror
+        :param path: Path of the endpoint, requests to other paths are rejected.
+            The path is the only authentication of webhooks, so it should be hard to guess,
+            because anyone who knows it can send events.
+        :type path: string
+        :param host: Address to listen on, only local connections are accepted by default
+        :type host: string
+        :param port: Port to listen on, 0 picks a free port
+        :type port: int
+        :param max_body_size: Requests with bigger bodies in bytes are rejected
+        :type max_body_size: int
+        """
+        if not path or path == '/':
+            raise ValueError( 'Path of the endpoint should be a hard to guess string' )
+
+        self.mirror = mirror
+        self.path = path
+        self.max_body_size = max_body_size
+        self.server = http.server.ThreadingHTTPServer( (host, port), self.__get_handler__() )
+        self.__thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def serve_forever(self):
+        """Handles requests until stop is called"""
+        self.server.serve_forever()
+
+    def start(self):
+        """Handles requests in background thread"""
+        self.__thread = threading.Thread( target = self.serve_forever, daemon = True )
+        self.__thread.start()
+
+    def stop(self):
+        """Stops the endpoint"""
+        self.server.shutdown()
+        self.server.server_close()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __get_handler__(self):
+        receiver = self
+
+        class Handler (http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split('?')[0] != receiver.path:
+                    return self.__reply__( 404 )
+                try:
+                    length = int( self.headers.get( 'Content-Length', 0 ) )
+                except ValueError:
+                    return self.__reply__( 400 )
+                if length < 0 or length > receiver.max_body_size:
+                    self.close_connection = True
+                    return self.__reply__( 413 if length > 0 else 400 )
+                try:
+                    event = json.loads( self.rfile.read( length ) )
+                except ValueError:
+                    return self.__reply__( 400 )
+
+                events = event if isinstance( event, list ) else [ event ]
+                for event in events:
+                    if isinstance( event, dict ):
+                        receiver.mirror.apply( event )
+                self.__reply__( 200 )
+
+            def __reply__(self, status):
+                self.send_response( status )
+                self.send_header( 'Content-Length', '0' )
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Profiling of the client, which attributes time of requests to stages:
+queue (waiting for rate budget and scheduler), network, decoding of compressed body,
+json parsing and construction of objects.
+"""
+
+import re
+import threading
+import time
+
+
+STAGES = ( 'queue', 'network', 'decode', 'parse', 'construct' )
+ID_PATTERN = re.compile( r'/\d+(?=/|$)' )
+
+
+class Counters (object):
+    """Counters of an endpoint or a model"""
+    def __init__(self):
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.total = 0.0
+        self.stages = dict.fromkeys( STAGES, 0.0 )
+
+
+class Profiler (object):
+    """Accumulates counters per endpoint and per model while it is attached to a client:
+
+        with client.profile() as profiler:
+            client.get_cards()
+        print( profiler.report() )
+    """
+
+    def __init__(self, client=None):
+        """
+        :param client: Client which is profiled inside of with statement
+        :type client: kaiten.Client
+        """
+        self.client = client
+        self.endpoints = {}
+        self.models = {}
+        self.stacks = {}
+        self.__previous = None
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+    def __enter__(self):
+        self.__previous = self.client.profiler
+        self.client.profiler = self
+        return self
+
+    def __exit__(self, *args):
+        self.client.profiler = self.__previous
+        self.__previous = None
+
+    def record_request(self, method, path, sent, received, queue, network, decode, parse):
+        """Records timings of a request in seconds and sizes of bodies in bytes"""
+        endpoint = method + ' ' + ID_PATTERN.sub( '/:id', path.split('?')[0] )
+        self.__local.endpoint = endpoint
+
+        with self.__lock:
+            counters = self.__get_counters__( self.endpoints, endpoint )
+            counters.calls += 1
+            counters.bytes_sent += sent
+            counters.bytes_received += received
+            counters.total += queue + network + decode + parse
+            for stage, elapsed in ( ('queue', queue), ('network', network), ('decode', decode), ('parse', parse) ):
+                counters.stages[stage] += elapsed
+                self.__add_stack__( ( endpoint, stage ), elapsed )
+
+    def enter_model(self, name):
+        """Starts construction of object of the model, constructions can be nested
+        :param name: Name of the model class
+        :type name: string
+        """
+        stack = self.__get_stack__()
+        stack.append( [ name, time.perf_counter(), 0.0 ] )
+
+    def exit_model(self):
+        """Finishes construction of the object which was started last"""
+        stack = self.__get_stack__()
+        finished = time.perf_counter()
+        name, started, children = stack.pop()
+        elapsed = finished - started
+        if stack:
+            stack[-1][2] += elapsed
+
+        endpoint = getattr( self.__local, 'endpoint', None ) or '-'
+        with self.__lock:
+            counters = self.__get_counters__( self.models, name )
+            counters.calls += 1
+            counters.total += elapsed
+            counters.stages['construct'] += elapsed - children
+            if not stack:
+                counters = self.__get_counters__( self.endpoints, endpoint )
+                counters.total += elapsed
+                counters.stages['construct'] += elapsed
+            self.__add_stack__(
+                ( endpoint, 'construct' ) + tuple( item[0] for item in stack ) + ( name, ),
+                elapsed - children,
+            )
+
+    def report(self):
+        """Returns a table with counters per endpoint and per model, times are in milliseconds"""
+        lines = [
+            '{:<40} {:>7} {:>10} {:>10} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}'.format(
+                'endpoint', 'calls', 'sent', 'received', 'total', *STAGES
+            )
+        ]
+        with self.__lock:
+            for endpoint, counters in sorted( self.endpoints.items(), key = lambda item: -item[1].total ):
+                lines.append( '{:<40} {:>7} {:>10} {:>10} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}'.format(
+                    endpoint, counters.calls, counters.bytes_sent, counters.bytes_received,
+                    counters.total * 1000, *[ counters.stages[stage] * 1000 for stage in STAGES ]
+                ) )
+
+            lines.append( '' )
+            lines.append( '{:<40} {:>7} {:>9} {:>9}'.format( 'model', 'calls', 'total', 'self' ) )
+            for name, counters in sorted( self.models.items(), key = lambda item: -item[1].total ):
+                lines.append( '{:<40} {:>7} {:>9.1f} {:>9.1f}'.format(
+                    name, counters.calls, counters.total * 1000, counters.stages['construct'] * 1000
+                ) )
+        return '\n'.join( lines )
+
+    def collapsed(self):
+        """Returns stacks in collapsed format of flamegraph.pl and speedscope,
+        one stack per line with its time in microseconds"""
+        with self.__lock:
+            return '\n'.join(
+                '{} {}'.format( ';'.join(stack), int( elapsed * 1000000 ) )
+                for stack, elapsed in sorted( self.stacks.items() )
+            )
+
+    def __get_stack__(self):
+        stack = getattr( self.__local, 'stack', None )
+        if stack is None:
+            stack = self.__local.stack = []
+        return stack
+
+    def __get_counters__(self, counters, key):
+        if key not in counters:
+            counters[key] = Counters()
+        return counters[key]
+
+    def __add_stack__(self, stack, elapsed):
+        self.stacks[stack] = self.stacks.get( stack, 0.0 ) + elapsed
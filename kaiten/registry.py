@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Registry of clients for serving many Kaiten accounts from one process.
+"""
+
+import threading
+import time
+
+from kaiten.client import Client
+from kaiten.transport import HTTPSTransport
+
+
+class RateBudget (object):
+    """Token bucket which limits the rate of requests"""
+
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: Amount of requests per second
+        :type rate: float
+        :param burst: Max amount of requests which can be sent at once, by default rate
+        :type burst: float
+        """
+        self.rate = float( rate )
+        self.burst = float( burst if burst is not None else max( rate, 1 ) )
+        self.__tokens = self.burst
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """Waits until the budget allows one more request"""
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min( self.burst, self.__tokens + ( now - self.__updated ) * self.rate )
+                self.__updated = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                delay = ( 1 - self.__tokens ) / self.rate
+            time.sleep( delay )
+
+
+class ClientRegistry (object):
+    """Creates clients for tenants, which are identified by host and username.
+
+    Clients of the same host share one transport with its pool of connections,
+    so amount of sockets depends on amount of hosts, not tenants. Each client
+    keeps its own credentials, mirror and rate budget.
+    """
+
+    MANAGED_PARAMS = ( 'transport', 'rate_budget' )
+
+    def __init__(self, transport_factory=None, **params):
+        """
+        :param transport_factory: Callable which creates transport for a host,
+            by default HTTPSTransport
+        :type transport_factory: callable
+        :param params: Other parameters for created clients, for example compress_threshold.
+            Transport and rate budget are set by the registry.
+        :type params: dict
+        """
+        for name in self.MANAGED_PARAMS:
+            if name in params:
+                raise TypeError( "{} is set by the registry and can't be passed to it".format(name) )
+
+        self.transport_factory = transport_factory or HTTPSTransport
+        self.params = params
+        self.__transports = {}
+        self.__clients = {}
+        self.__limits = {}
+        self.__lock = threading.RLock()
+
+    def get_client(self, host, username, password, rate=None, burst=None):
+        """Returns a client of the tenant, creating it on the first call.
+        A client is recreated if the password of the tenant has changed,
+        its rate budget is replaced if the limits have changed.
+        :param host: IP or hostname of Kaiten server
+        :type host: string
+        :param username: Login name for connection
+        :type username: string
+        :param password: User's password for connection
+        :type password: string
+        :param rate: Limit of requests per second for the tenant, no limit by default
+        :type rate: float
+        :param burst: Max amount of requests of the tenant which can be sent at once
+        :type burst: float
+        """
+        key = ( host, username )
+        with self.__lock:
+            client = self.__clients.get(key)
+            limits = ( rate, burst )
+            if client is None or client.password != password:
+                client = Client(
+                    host, username, password,
+                    transport   = self.get_transport( host ),
+                    rate_budget = RateBudget( rate, burst ) if rate else None,
+                    **self.params
+                )
+                self.__clients[key] = client
+            elif self.__limits.get(key) != limits:
+                client.rate_budget = RateBudget( rate, burst ) if rate else None
+            self.__limits[key] = limits
+            return client
+
+    def get_transport(self, host):
+        """Returns transport which is shared by clients of the host
+        :param host: IP or hostname of Kaiten server
+        :type host: string
+        """
+        with self.__lock:
+            transport = self.__transports.get(host)
+            if transport is None:
+                transport = self.__transports[host] = self.transport_factory( host )
+            return transport
+
+    def remove_client(self, host, username):
+        """Forgets the client of the tenant, connections of the host stay open
+        :param host: IP or hostname of Kaiten server
+        :type host: string
+        :param username: Login name for connection
+        :type username: string
+        """
+        with self.__lock:
+            self.__clients.pop( ( host, username ), None )
+            self.__limits.pop( ( host, username ), None )
+
+    def close(self):
+        """Closes connections of all hosts"""
+        with self.__lock:
+            for transport in self.__transports.values():
+                transport.close()
+            self.__transports.clear()
+            self.__clients.clear()
+            self.__limits.clear()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Scheduler of requests for mixed interactive and batch traffic.
+"""
+
+import collections
+import contextlib
+import contextvars
+import threading
+
+
+INTERACTIVE = 'interactive'
+BATCH       = 'batch'
+
+
+class PriorityClass (object):
+    """Class of requests with its share of the scheduler"""
+    def __init__(self, name, weight, max_in_flight):
+        self.name = name
+        self.weight = weight
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.waiting = collections.deque()
+        self.virtual_time = 0.0
+
+
+class RequestScheduler (object):
+    """Admits requests of priority classes with weighted fair queueing.
+
+    When there are more requests than slots, each class gets a share of slots
+    proportional to its weight, so interactive requests jump ahead of batch
+    traffic, but batch traffic isn't starved. Each class can also have
+    its own limit of requests in flight.
+
+    Priority of requests is set per context, it is inherited by threads
+    which run requests in a copy of the context, like Client.get_time_logs_bulk does:
+
+        with scheduler.priority(BATCH):
+            client.get_cards()
+    """
+
+    def __init__(self, max_in_flight=8, default=INTERACTIVE):
+        """
+        :param max_in_flight: Max amount of requests in flight for all classes
+        :type max_in_flight: int
+        :param default: Class of requests which are sent without priority
+        :type default: string
+        """
+        self.max_in_flight = max_in_flight
+        self.default = default
+        self.classes = {}
+        self.__in_flight = 0
+        self.__condition = threading.Condition()
+        self.__priority = contextvars.ContextVar( 'kaiten_priority', default = None )
+
+        self.add_class( INTERACTIVE, weight = 8 )
+        self.add_class( BATCH, weight = 1, max_in_flight = max( 1, max_in_flight // 2 ) )
+
+    def add_class(self, name, weight=1, max_in_flight=None):
+        """Adds priority class or changes parameters of existing one
+        :param name: Name of the class
+        :type name: string
+        :param weight: Share of the class relative to other classes
+        :type weight: float
+        :param max_in_flight: Max amount of requests of the class in flight, no own limit by default
+        :type max_in_flight: int
+        """
+        with self.__condition:
+            if name in self.classes:
+                self.classes[name].weight = weight
+                self.classes[name].max_in_flight = max_in_flight
+            else:
+                self.classes[name] = PriorityClass( name, weight, max_in_flight )
+            self.__dispatch__()
+
+    @contextlib.contextmanager
+    def priority(self, name):
+        """Sets priority class for requests which are sent in the current context
+        :param name: Name of the class
+        :type name: string
+        """
+        if name not in self.classes:
+            raise KeyError( 'Unknown priority class {}'.format(name) )
+        token = self.__priority.set( name )
+        try:
+            yield
+        finally:
+            self.__priority.reset( token )
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Waits for a slot for request of the current context and holds it"""
+        name = self.__priority.get() or self.default
+        self.acquire( name )
+        try:
+            yield
+        finally:
+            self.release( name )
+
+    def acquire(self, name):
+        """Waits for a slot for request of the class
+        :param name: Name of the class
+        :type name: string
+        """
+        klass = self.classes[name]
+        ticket = [ False ]
+        with self.__condition:
+            if not klass.waiting and not klass.in_flight:
+                # Idle class starts from current virtual time instead of using saved up share
+                klass.virtual_time = max( klass.virtual_time, self.__get_virtual_time__() )
+            klass.waiting.append( ticket )
+            self.__dispatch__()
+            try:
+                while not ticket[0]:
+                    self.__condition.wait()
+            except BaseException:
+                # Interrupted request gives up its place, so the slot isn't lost
+                if ticket[0]:
+                    self.release( name )
+                else:
+                    self.__discard__( klass, ticket )
+                raise
+
+    def release(self, name):
+        """Frees the slot which was acquired for request of the class
+        :param name: Name of the class
+        :type name: string
+        """
+        with self.__condition:
+            self.classes[name].in_flight -= 1
+            self.__in_flight -= 1
+            self.__dispatch__()
+
+    def __discard__(self, klass, ticket):
+        # Tickets are compared by identity, equal tickets of other requests are kept
+        for index, waiting in enumerate( klass.waiting ):
+            if waiting is ticket:
+                del klass.waiting[index]
+                return
+
+    def __get_virtual_time__(self):
+        busy = [ klass.virtual_time for klass in self.classes.values() if klass.waiting or klass.in_flight ]
+        return min( busy ) if busy else 0.0
+
+    def __dispatch__(self):
+        granted = False
+        while self.__in_flight < self.max_in_flight:
+            ready = [
+                klass for klass in self.classes.values()
+                if klass.waiting and ( klass.max_in_flight is None or klass.in_flight < klass.max_in_flight )
+            ]
+            if not ready:
+                break
+            klass = min( ready, key = lambda klass: klass.virtual_time )
+            klass.waiting.popleft()[0] = True
+            klass.in_flight += 1
+            klass.virtual_time += 1.0 / klass.weight
+            self.__in_flight += 1
+            granted = True
+        if granted:
+            self.__condition.notify_all()
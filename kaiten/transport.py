@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Transports which deliver HTTP requests of the client to Kaiten API server.
+"""
+
+import http.client
+import queue
+import time
+import zlib
+
+from kaiten.exceptions import InvalidResponseFormat
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+IDEMPOTENT_METHODS = ( 'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE' )
+ACCEPT_ENCODING = 'gzip, deflate, br' if brotli else 'gzip, deflate'
+DECODE_ERRORS = ( zlib.error, brotli.error ) if brotli else ( zlib.error, )
+CHUNK_SIZE = 64 * 1024
+
+
+class BrotliDecoder (object):
+    """Adapts brotli decompressor to the interface of zlib decompress objects"""
+    def __init__(self):
+        self.__decompressor = brotli.Decompressor()
+
+    def decompress(self, data):
+        return self.__decompressor.process( data )
+
+    def flush(self):
+        return b''
+
+
+class DeflateDecoder (object):
+    """Decoder of deflate bodies, which are sent by some servers in zlib format
+    and by others as raw deflate streams without zlib header"""
+    def __init__(self):
+        self.__decompressor = zlib.decompressobj()
+        self.__started = False
+
+    def decompress(self, data):
+        if not self.__started:
+            self.__started = True
+            try:
+                return self.__decompressor.decompress( data )
+            except zlib.error:
+                self.__decompressor = zlib.decompressobj( -zlib.MAX_WBITS )
+        return self.__decompressor.decompress( data )
+
+    def flush(self):
+        return self.__decompressor.flush()
+
+
+def get_decoder(encoding):
+    """Returns a streaming decoder for the content encoding of response
+    or None if the body isn't compressed
+    :param encoding: Value of Content-Encoding header
+    :type encoding: string
+    """
+    encoding = encoding.strip().lower()
+    if encoding in ( 'gzip', 'x-gzip' ):
+        return zlib.decompressobj( 16 + zlib.MAX_WBITS )
+    if encoding == 'deflate':
+        return DeflateDecoder()
+    if encoding == 'br' and brotli:
+        return BrotliDecoder()
+    return None
+
+
+class Response (object):
+    """Response which was gotten from api server"""
+    def __init__(self, status, headers, body, decode_time=0.0):
+        """
+        :param status: HTTP status code
+        :type status: int
+        :param headers: Response headers with lowercased names
+        :type headers: dict
+        :param body: Raw response body
+        :type body: bytes
+        :param decode_time: Time in seconds which was spent on decompression of body
+        :type decode_time: float
+        """
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.decode_time = decode_time
+
+
+class Transport (object):
+    """Base class for transports, descendants should implement method request"""
+
+    def request(self, method, url, body, headers):
+        """Performs HTTP request, returning instance of Response
+        :param method: Method name for HTTP request
+        :type method: string
+        :param url: Path of request including the entry point of API and query string
+        :type url: string
+        :param body: Request body
+        :type body: bytes
+        :param headers: HTTP headers of request
+        :type headers: dict
+        """
+        raise NotImplementedError('You should implement method request in descendant class')
+
+    def close(self):
+        """Closes all connections of the transport"""
+        pass
+
+
+class HTTPSTransport (Transport):
+    """HTTP/1.1 transport which keeps a pool of persistent connections to the host.
+    Compressed responses are decompressed chunk by chunk while they are read.
+    """
+
+    def __init__(self, host, pool_size=10, timeout=None, connection_class=http.client.HTTPSConnection):
+        """
+        :param host: IP or hostname of Kaiten server
+        :type host: string
+        :param pool_size: Max number of idle connections which are kept open
+        :type pool_size: int
+        :param timeout: Socket timeout in seconds
+        :type timeout: float
+        :param connection_class: Class of connections,
+            http.client.HTTPConnection can be used for plain http
+        :type connection_class: type
+        """
+        self.host = host
+        self.timeout = timeout
+        self.connection_class = connection_class
+        self.__pool = queue.LifoQueue( pool_size )
+
+    def request(self, method, url, body, headers):
+        conn, reused = self.__acquire__()
+        try:
+            resp = self.__send__( conn, method, url, body, headers )
+        except ( http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError ):
+            conn.close()
+            # Server has closed an idle connection, retrying with a new one.
+            # Other methods aren't retried, the server could have processed the request
+            if not reused or method not in IDEMPOTENT_METHODS:
+                raise
+            conn = self.__connect__()
+            try:
+                resp = self.__send__( conn, method, url, body, headers )
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+        self.__release__( conn, resp.will_close )
+        return Response(
+            resp.status,
+            { key.lower(): value for key, value in resp.getheaders() },
+            resp.data,
+            resp.decode_time,
+        )
+
+    def close(self):
+        while True:
+            try:
+                self.__pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __send__(self, conn, method, url, body, headers):
+        conn.request( method, url, body, headers )
+        resp = conn.getresponse()
+        resp.decode_time = 0.0
+        resp.data = self.__read__( resp, method, url )
+        return resp
+
+    def __read__(self, resp, method, url):
+        encoding = resp.getheader( 'Content-Encoding', '' )
+        decoder = get_decoder( encoding )
+        if decoder is None:
+            return resp.read()
+
+        chunks = []
+        chunk = resp.read( CHUNK_SIZE )
+        try:
+            while chunk:
+                started = time.perf_counter()
+                chunks.append( decoder.decompress( chunk ) )
+                resp.decode_time += time.perf_counter() - started
+                chunk = resp.read( CHUNK_SIZE )
+            chunks.append( decoder.flush() )
+        except DECODE_ERRORS as e:
+            raise InvalidResponseFormat(
+                url, method, "Body with Content-Encoding {} can't be decoded: {}".format( encoding, e )
+            )
+        return b''.join( chunks )
+
+    def __connect__(self):
+        return self.connection_class( self.host, timeout = self.timeout )
+
+    def __acquire__(self):
+        try:
+            return self.__pool.get_nowait(), True
+        except queue.Empty:
+            return self.__connect__(), False
+
+    def __release__(self, conn, will_close):
+        if will_close:
+            conn.close()
+            return
+        try:
+            self.__pool.put_nowait( conn )
+        except queue.Full:
+            conn.close()
+
+
+class HTTP2Transport (Transport):
+    """HTTP/2 transport which multiplexes concurrent requests over one connection.
+    Compressed responses are decompressed by httpx.
+    Requires httpx with http2 support: pip install httpx[http2]
+    """
+
+    def __init__(self, host, timeout=None, scheme='https'):
+        """
+        :param host: IP or hostname of Kaiten server
+        :type host: string
+        :param timeout: Socket timeout in seconds
+        :type timeout: float
+        :param scheme: 'https' or 'http', plain http uses HTTP/2 with prior knowledge
+        :type scheme: string
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('HTTP2Transport requires httpx, install it with: pip install httpx[http2]')
+
+        self.host = host
+        self.__decoding_error = httpx.DecodingError
+        self.__client = httpx.Client(
+            base_url = scheme + '://' + host,
+            http1    = scheme != 'http',
+            http2    = True,
+            timeout  = timeout,
+        )
+
+    def request(self, method, url, body, headers):
+        try:
+            resp = self.__client.request( method, url, content = body, headers = headers )
+        except self.__decoding_error as e:
+            raise InvalidResponseFormat( url, method, "Body can't be decoded: {}".format(e) )
+        return Response(
+            resp.status_code,
+            { key.lower(): value for key, value in resp.headers.items() },
+            resp.content,
+        )
+
+    def close(self):
+        self.__client.close()
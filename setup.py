@@ -8,4 +8,5 @@ setup(name='kaiten',
       author_email='k.sysoev',
       license='MIT',
       packages=['kaiten'],
+      extras_require={'http2': ['httpx[http2]']},
       zip_safe=False)
\ No newline at end of file